@@ -4,8 +4,9 @@ This library provides functionality to authenticate with the BMSTU LKS portal
 and obtain JWT tokens for further API access.
 """
 
+from .async_client import AsyncBmstuLksClient
 from .client import BmstuLksClient, LoginError
 from .types import LoginResponse, TokenInfo
 
 __version__ = "0.1.0"
-__all__ = ["BmstuLksClient", "LoginError", "LoginResponse", "TokenInfo"]
+__all__ = ["AsyncBmstuLksClient", "BmstuLksClient", "LoginError", "LoginResponse", "TokenInfo"]
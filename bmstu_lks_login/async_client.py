@@ -0,0 +1,177 @@
+"""Asynchronous BMSTU LKS Login Client implementation."""
+
+import logging
+import functools
+from datetime import datetime
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Optional
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+from .client import (
+    BmstuLksClient,
+    LoginError,
+    _DEFAULT_HEADERS,
+    _REDIRECT_STATUSES,
+    _build_login_response,
+    _decode_raw,
+    _next_hop,
+    _portal_tokens,
+    _prepare_cas_login,
+)
+from .types import LoginResponse
+
+
+class AsyncBmstuLksClient:
+    """Asynchronous client for authenticating with BMSTU LKS portal.
+    
+    Logins share one HTTP/2 client but each keeps its own cookies, so several
+    logins can run concurrently on the same instance.
+    """
+    
+    PORTAL_LOGIN_URL = BmstuLksClient.PORTAL_LOGIN_URL
+    PORTAL_PROFILE_URL = BmstuLksClient.PORTAL_PROFILE_URL
+    _PORTAL_LOGIN_WITH_BACK = BmstuLksClient._PORTAL_LOGIN_WITH_BACK
+    
+    def __init__(self, current_time: Optional[datetime] = None):
+        """Initialize the client.
+        
+        Args:
+            current_time: Optional fixed time to use for token validation.
+                        If not provided, system time will be used.
+        
+        Raises:
+            ImportError: If httpx is not installed.
+        """
+        if httpx is None:
+            raise ImportError(
+                "AsyncBmstuLksClient requires httpx, install it with "
+                "pip install \"bmstu-lks-login[async]\""
+            )
+        
+        self.current_time = current_time
+        self.logger = logging.getLogger(__name__)
+        
+        # Long-lived client keeps connections alive across logins. Its own jar
+        # refuses every cookie: cookies live in a per-login jar instead.
+        self._client = httpx.AsyncClient(
+            http2=True,
+            # Connection-specific headers are not allowed over HTTP/2
+            headers={k: v for k, v in _DEFAULT_HEADERS.items() if k != 'Connection'},
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+        )
+        
+        # Default headers for requests; changes apply to every later request
+        self.headers = self._client.headers
+        
+        # Decoded tokens cached by raw token string, for repeated logins
+        self._decode_raw = functools.lru_cache(maxsize=512)(_decode_raw)
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP client and release pooled connections.
+        
+        Also drops this client's cached decoded tokens.
+        """
+        await self._client.aclose()
+        self._decode_raw.cache_clear()
+    
+    async def __aenter__(self) -> "AsyncBmstuLksClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.aclose()
+    
+    async def _send(self, cookies: "httpx.Cookies", method: str, url: str,
+                    follow_redirects: bool = False, **kwargs) -> "httpx.Response":
+        """Send a request using the cookies of one login.
+        
+        Args:
+            cookies: Cookies of the current login, updated from every response.
+            method: HTTP method.
+            url: Request URL.
+            follow_redirects: Whether to follow redirects.
+            **kwargs: Extra arguments for building the request.
+        
+        Returns:
+            The final response.
+        
+        Raises:
+            LoginError: If redirects exceed the client's max_redirects.
+        """
+        request = self._client.build_request(method, url, **kwargs)
+        for _ in range(self._client.max_redirects + 1):
+            cookies.set_cookie_header(request)
+            response = await self._client.send(request, follow_redirects=False)
+            cookies.extract_cookies(response)
+            if not follow_redirects or response.next_request is None:
+                return response
+            request = response.next_request
+        
+        raise LoginError(f"Exceeded {self._client.max_redirects} redirects")
+    
+    async def login(self, username: str, password: str) -> LoginResponse:
+        """Log in to BMSTU LKS portal.
+        
+        Args:
+            username: BMSTU username.
+            password: BMSTU password.
+        
+        Returns:
+            LoginResponse object containing tokens and user information.
+        
+        Raises:
+            LoginError: If login process fails.
+        """
+        cookies = httpx.Cookies()
+        
+        # Start at portal login page
+        self.logger.info("Starting login process...")
+        portal_response = await self._send(cookies, 'GET', self._PORTAL_LOGIN_WITH_BACK, follow_redirects=True)
+        
+        if portal_response.status_code != 200:
+            raise LoginError(f"Failed to access portal login page: {portal_response.status_code}")
+        
+        # Get the CAS login form
+        cas_url = str(portal_response.url)
+        form_data, cas_headers = _prepare_cas_login(portal_response.content, cas_url, username, password)
+        
+        # Submit CAS login
+        self.logger.info("Submitting login credentials...")
+        cas_response = await self._send(cookies, 'POST', cas_url, data=form_data, headers=cas_headers)
+        
+        if cas_response.status_code == 401:
+            raise LoginError("Invalid username or password")
+        
+        # Follow redirects manually to capture all cookies
+        current_response = cas_response
+        login_token = None
+        info_token = None
+        hops = 0
+        
+        while current_response.status_code in _REDIRECT_STATUSES:
+            location = current_response.headers.get('Location')
+            if not location:
+                break
+            
+            hops += 1
+            if hops > self._client.max_redirects:
+                raise LoginError(f"Exceeded {self._client.max_redirects} redirects")
+            
+            redirect_url, redirect_headers = _next_hop(str(current_response.url), location, self.PORTAL_LOGIN_URL)
+            current_response = await self._send(cookies, 'GET', redirect_url, headers=redirect_headers)
+            
+            # Portal tokens are parsed into the login's cookie jar as responses arrive
+            login_token, info_token = _portal_tokens(cookies.jar)
+            
+            if login_token and info_token:
+                break
+        
+        if not (login_token and info_token):
+            raise LoginError("Did not receive portal tokens")
+        
+        self.logger.info("Successfully obtained portal tokens")
+        
+        return _build_login_response(login_token, info_token, self.current_time, self._decode_raw)
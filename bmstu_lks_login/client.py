@@ -1,29 +1,417 @@
 """BMSTU LKS Login Client implementation."""
 
 import base64
+import binascii
+import functools
+import html
 import json
 import logging
+import re
 from datetime import datetime
+from http.cookiejar import CookieJar
 from typing import Optional, Tuple
 from urllib.parse import quote, urljoin
 
-import jwt
+import lxml.html
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError, SSLError
 
 from .types import LoginResponse, TokenInfo
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+
+# Browser-like headers sent with every request
+_DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Connection': 'keep-alive',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'same-origin',
+    'Sec-Fetch-User': '?1',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Static part of the CAS login headers; defaults come from the client
+_CAS_BASE_HEADERS = {
+    'Origin': 'https://proxy.bmstu.ru:8443',
+    'Content-Type': 'application/x-www-form-urlencoded'
+}
+
+_REDIRECT_STATUSES = (301, 302, 303, 307)
+
+# Fast path: the CAS login page is small and regular, so hidden inputs of the
+# first form are scraped straight from the raw bytes without building a DOM
+_COMMENT_RE = re.compile(rb'<!--.*?-->', re.S)
+_FORM_RE = re.compile(rb'<form\b.*?</form\s*>', re.I | re.S)
+_INPUT_START_RE = re.compile(rb'<input\b', re.I)
+_INPUT_RE = re.compile(rb'<input\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.I)
+_ATTR_RE = re.compile(rb'([^\s"\'<>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+
+# Fallback for pages the regex cannot handle: hidden inputs of the first form
+_HIDDEN_INPUTS_XPATH = etree.XPath(
+    '(//form)[1]//input[translate(@type, "HIDEN", "hiden")="hidden" and @name!=""]'
+)
+
 
 class LoginError(Exception):
     """Raised when login process fails."""
     pass
 
 
+def _decode_unicode_escape(text: str) -> str:
+    """Decode Unicode escapes in text.
+    
+    Args:
+        text: Text containing Unicode escapes.
+        
+    Returns:
+        Decoded text.
+    """
+    return text.encode('utf-8').decode('unicode-escape').encode('latin1').decode('utf-8')
+
+
+class _FrozenDict(dict):
+    """Read-only dict for decoded token data shared through a token cache."""
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Decoded token data is read-only")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        # Copies and pickles come back as plain, mutable dicts
+        return dict, (dict(self),)
+
+
+def _freeze(value):
+    """Recursively make decoded JSON read-only.
+    
+    Args:
+        value: Decoded JSON value.
+        
+    Returns:
+        The value with dicts made read-only and lists turned into tuples.
+    """
+    if isinstance(value, dict):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _decode_raw(token: str, token_name: str) -> Tuple[dict, float, str]:
+    """Decode a portal token without checking its expiration.
+    
+    The decoded data is frozen, so clients can cache results by raw token
+    string and hand the same object out on every hit.
+    
+    Args:
+        token: The token string to decode.
+        token_name: Name of the token ("portal3_login" or "portal3_info").
+        
+    Returns:
+        Tuple of decoded token data, expiration timestamp and user's name.
+        
+    Raises:
+        LoginError: If token is invalid.
+    """
+    try:
+        if token_name == "portal3_login":
+            # Login token is a JWT; the signature is not verified, so just
+            # base64url-decode the payload segment
+            payload_b64 = token.split('.', 2)[1]
+            payload_b64 += '=' * (-len(payload_b64) % 4)
+            decoded = _json_loads(base64.urlsafe_b64decode(payload_b64))
+            exp_field = 'exp'
+        else:
+            # Info token is plain base64 JSON; the URL-safe decoder accepts both
+            # alphabets and the JSON decoder takes the bytes as they are
+            decoded = _json_loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            exp_field = 'expire'
+        
+        if not isinstance(decoded, dict):
+            raise LoginError(f"Invalid {token_name} token: payload is not an object")
+        
+        # Get expiration time
+        exp_timestamp = decoded.get(exp_field)
+        if not exp_timestamp:
+            raise LoginError(f"No expiration time in {token_name} token")
+        
+        # Extract name and decode Unicode escapes
+        if token_name == "portal3_login":
+            name = decoded.get('usr', {}).get('name', '')
+        else:
+            name = decoded.get('name', '')
+        
+        return _freeze(decoded), exp_timestamp, _decode_unicode_escape(name)
+        
+    except (ValueError, IndexError, json.JSONDecodeError, binascii.Error) as e:
+        raise LoginError(f"Invalid {token_name} token: {str(e)}")
+
+
+def _scan_hidden_inputs(html_content: bytes) -> Optional[dict]:
+    """Scrape hidden inputs of the first form with regular expressions.
+    
+    Args:
+        html_content: Raw HTML content of the login page.
+    
+    Returns:
+        Dictionary of form field names and values, or None if the markup
+        cannot be scanned reliably and has to go through a real parser.
+    """
+    form = _FORM_RE.search(_COMMENT_RE.sub(b'', html_content))
+    if not form:
+        return None
+    
+    tags = _INPUT_RE.findall(form.group(0))
+    if len(tags) != len(_INPUT_START_RE.findall(form.group(0))):
+        # Some <input> tag is malformed, e.g. has an unterminated quote
+        return None
+    
+    form_data = {}
+    try:
+        for tag in tags:
+            attrs = {}
+            for key, double_quoted, single_quoted, unquoted in _ATTR_RE.findall(tag):
+                # Like browsers, the first occurrence of an attribute wins
+                attrs.setdefault(key.lower(), double_quoted or single_quoted or unquoted)
+            
+            name = attrs.get(b'name')
+            if name and attrs.get(b'type', b'').lower() == b'hidden':
+                value = attrs.get(b'value', b'')
+                form_data[html.unescape(name.decode('utf-8'))] = html.unescape(value.decode('utf-8'))
+    except UnicodeDecodeError:
+        # Not UTF-8, lxml picks the encoding up from the page itself
+        return None
+    
+    return form_data
+
+
+def _parse_hidden_inputs(html_content: bytes) -> dict:
+    """Extract hidden inputs of the first form with lxml.
+    
+    Args:
+        html_content: Raw HTML content of the login page.
+    
+    Returns:
+        Dictionary of form field names and values.
+    
+    Raises:
+        LoginError: If the page cannot be parsed.
+    """
+    try:
+        root = lxml.html.fromstring(html_content)
+    except (etree.ParserError, ValueError) as e:
+        raise LoginError(f"Could not parse login page: {str(e)}")
+    
+    return {
+        el.get('name'): el.get('value', '')
+        for el in _HIDDEN_INPUTS_XPATH(root)
+    }
+
+
+def _extract_form_data(html_content: bytes) -> dict:
+    """Extract hidden form fields from login page.
+    
+    Args:
+        html_content: Raw HTML content of the login page.
+    
+    Returns:
+        Dictionary of form field names and values.
+    
+    Raises:
+        LoginError: If form fields cannot be found.
+    """
+    # Only hidden fields are needed; credentials and submit are filled in by the caller
+    form_data = _scan_hidden_inputs(html_content)
+    if form_data is None:
+        # Malformed or unusual markup, let lxml recover it
+        form_data = _parse_hidden_inputs(html_content)
+    
+    if not form_data:
+        raise LoginError("Could not find login form fields")
+    
+    return form_data
+
+
+def _decode_portal_token(token: str, token_name: str, current_time: Optional[datetime],
+                         decode_raw=_decode_raw) -> TokenInfo:
+    """Decode and validate a portal token.
+    
+    Args:
+        token: The token string to decode.
+        token_name: Name of the token ("portal3_login" or "portal3_info").
+        current_time: Fixed time to validate against, or None for system time.
+        decode_raw: Decoder to use, e.g. a client's cached _decode_raw.
+    
+    Returns:
+        TokenInfo object containing decoded token data.
+    
+    Raises:
+        LoginError: If token is invalid or expired.
+    """
+    decoded, exp_timestamp, name = decode_raw(token, token_name)
+    
+    # Expiration is checked on every call, cached or not
+    current_time = current_time or datetime.now()
+    if current_time.timestamp() > exp_timestamp:
+        raise LoginError(f"{token_name} token has expired")
+    
+    return TokenInfo(
+        raw_token=token,
+        decoded_data=decoded,
+        expiration=datetime.fromtimestamp(exp_timestamp),
+        name=name
+    )
+
+
+def _find_cookie(jar: CookieJar, name: str) -> Optional[str]:
+    """Look up a cookie value by name.
+    
+    Unlike a name lookup on the requests or httpx jars, this does not fail
+    when the same cookie is set for several domains or paths.
+    
+    Args:
+        jar: Cookie jar to search.
+        name: Cookie name.
+        
+    Returns:
+        Value of the first matching cookie, or None if there is none.
+    """
+    return next((cookie.value for cookie in jar if cookie.name == name), None)
+
+
+def _prepare_cas_login(html_content: bytes, cas_url: str, username: str, password: str) -> Tuple[dict, dict]:
+    """Build the CAS login form submission.
+    
+    Args:
+        html_content: Raw HTML content of the CAS login page.
+        cas_url: URL of the CAS login page.
+        username: BMSTU username.
+        password: BMSTU password.
+        
+    Returns:
+        Tuple of form data and per-request headers.
+        
+    Raises:
+        LoginError: If form fields cannot be found.
+    """
+    form_data = _extract_form_data(html_content)
+    form_data.update({
+        "username": username,
+        "password": password,
+        "submit": "LOGIN"
+    })
+    return form_data, {**_CAS_BASE_HEADERS, 'Referer': cas_url}
+
+
+def _next_hop(current_url: str, location: str, portal_login_url: str) -> Tuple[str, dict]:
+    """Resolve a redirect and pick its per-hop headers.
+    
+    Args:
+        current_url: URL of the redirect response.
+        location: Value of its Location header.
+        portal_login_url: Referer to send to the portal.
+        
+    Returns:
+        Tuple of absolute redirect URL and headers to merge with the defaults.
+    """
+    # Make redirect URL absolute if it's relative
+    redirect_url = urljoin(current_url, location) if location.startswith('/') else location
+    
+    # Per-hop headers based on domain
+    if 'lks.bmstu.ru' in redirect_url:
+        return redirect_url, {'Origin': 'https://lks.bmstu.ru', 'Referer': portal_login_url}
+    return redirect_url, {'Origin': 'https://proxy.bmstu.ru:8443', 'Referer': current_url}
+
+
+def _portal_tokens(jar: CookieJar) -> Tuple[Optional[str], Optional[str]]:
+    """Get the raw portal3_login and portal3_info tokens from a cookie jar.
+    
+    Args:
+        jar: Cookie jar filled in during login.
+        
+    Returns:
+        Tuple of login and info tokens, None for any not set yet.
+    """
+    return _find_cookie(jar, '__portal3_login'), _find_cookie(jar, '__portal3_info')
+
+
+def _discard_body(response: requests.Response) -> None:
+    """Read and drop a streamed response body without decoding it.
+    
+    The connection goes back to the pool afterwards. urllib3 errors are
+    wrapped the same way requests wraps them when it reads a body itself.
+    
+    Args:
+        response: Response fetched with stream=True.
+        
+    Raises:
+        requests.RequestException: If reading the body fails.
+    """
+    try:
+        response.raw.read(decode_content=False)
+    except ProtocolError as e:
+        raise requests.exceptions.ChunkedEncodingError(e)
+    except ReadTimeoutError as e:
+        raise requests.exceptions.ConnectionError(e)
+    except SSLError as e:
+        raise requests.exceptions.SSLError(e)
+    finally:
+        response.close()
+
+
+def _build_login_response(login_token: str, info_token: str, current_time: Optional[datetime],
+                          decode_raw=_decode_raw) -> LoginResponse:
+    """Decode both portal tokens and collect user information.
+    
+    Args:
+        login_token: Raw portal3_login token.
+        info_token: Raw portal3_info token.
+        current_time: Fixed time to validate against, or None for system time.
+        decode_raw: Decoder to use, e.g. a client's cached _decode_raw.
+        
+    Returns:
+        LoginResponse object containing tokens and user information.
+        
+    Raises:
+        LoginError: If either token is invalid or expired.
+    """
+    login_token_info = _decode_portal_token(login_token, "portal3_login", current_time, decode_raw)
+    info_token_info = _decode_portal_token(info_token, "portal3_info", current_time, decode_raw)
+    
+    # Extract additional user info
+    user_info = login_token_info.decoded_data.get('usr', {})
+    student_id = user_info.get('id')
+    group = _decode_unicode_escape(user_info.get('alias', ''))
+    
+    return LoginResponse(
+        login_token=login_token_info,
+        info_token=info_token_info,
+        student_id=student_id,
+        group=group
+    )
+
+
 class BmstuLksClient:
-    """Client for authenticating with BMSTU LKS portal."""
+    """Client for authenticating with BMSTU LKS portal.
+    
+    Logins share one HTTP session and cookie jar, so a client instance is not
+    thread-safe: use a separate client per thread.
+    """
     
     PORTAL_LOGIN_URL = "https://lks.bmstu.ru/portal3/login"
     PORTAL_PROFILE_URL = "https://lks.bmstu.ru/profile"
+    _PORTAL_LOGIN_WITH_BACK = f"{PORTAL_LOGIN_URL}?back={quote(PORTAL_PROFILE_URL)}"
     
     def __init__(self, current_time: Optional[datetime] = None):
         """Initialize the client.
@@ -35,129 +423,32 @@ class BmstuLksClient:
         self.current_time = current_time
         self.logger = logging.getLogger(__name__)
         
-        # Default headers for requests
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Connection': 'keep-alive',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'same-origin',
-            'Sec-Fetch-User': '?1',
-            'Upgrade-Insecure-Requests': '1'
-        }
-    
-    def _extract_form_data(self, html_content: str) -> dict:
-        """Extract hidden form fields from login page.
+        # Persistent session so connections to the portal and CAS are
+        # kept alive and reused across logins
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=10))
         
-        Args:
-            html_content: HTML content of the login page.
-            
-        Returns:
-            Dictionary of form field names and values.
-            
-        Raises:
-            LoginError: If form fields cannot be found.
-        """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        form = soup.find('form')
-        form_data = {}
-        
-        if form:
-            for input_tag in form.find_all(['input', 'button']):
-                name = input_tag.get('name')
-                value = input_tag.get('value', '')
-                if name:
-                    form_data[name] = value
-        
-        if not form_data:
-            raise LoginError("Could not find login form fields")
-            
-        return form_data
-    
-    def _extract_token_from_cookie(self, cookie_str: str, token_name: str) -> Optional[str]:
-        """Extract token value from Set-Cookie header.
+        # Default headers for requests; changes apply to every later request
+        self._session.headers.update(_DEFAULT_HEADERS)
+        self.headers = self._session.headers
         
-        Args:
-            cookie_str: The Set-Cookie header value.
-            token_name: Name of the token to extract.
-            
-        Returns:
-            The token value if found, None otherwise.
-        """
-        prefix = f'__{token_name}='
-        if prefix in cookie_str:
-            return cookie_str.split(prefix)[1].split(';')[0]
-        return None
+        # Decoded tokens cached by raw token string, for repeated logins
+        self._decode_raw = functools.lru_cache(maxsize=512)(_decode_raw)
     
-    def _decode_unicode_escape(self, text: str) -> str:
-        """Decode Unicode escapes in text.
-        
-        Args:
-            text: Text containing Unicode escapes.
-            
-        Returns:
-            Decoded text.
-        """
-        return text.encode('utf-8').decode('unicode-escape').encode('latin1').decode('utf-8')
-
-    def _decode_portal_token(self, token: str, token_name: str) -> TokenInfo:
-        """Decode and validate a portal token.
+    def close(self) -> None:
+        """Close the underlying HTTP session and release pooled connections.
         
-        Args:
-            token: The token string to decode.
-            token_name: Name of the token ("portal3_login" or "portal3_info").
-            
-        Returns:
-            TokenInfo object containing decoded token data.
-            
-        Raises:
-            LoginError: If token is invalid or expired.
+        Also drops this client's cached decoded tokens.
         """
-        try:
-            if token_name == "portal3_login":
-                # Use JWT decoding for login token
-                decoded = jwt.decode(token, options={"verify_signature": False})
-                exp_field = 'exp'
-            else:
-                # Use base64 + JSON decoding for info token
-                decoded_bytes = base64.b64decode(token)
-                decoded = json.loads(decoded_bytes.decode('utf-8'))
-                exp_field = 'expire'
-            
-            # Get expiration time
-            exp_timestamp = decoded.get(exp_field)
-            if not exp_timestamp:
-                raise LoginError(f"No expiration time in {token_name} token")
-                
-            expiration = datetime.fromtimestamp(exp_timestamp)
-            
-            # Check expiration
-            current_time = self.current_time or datetime.now()
-            if current_time.timestamp() > exp_timestamp:
-                raise LoginError(f"{token_name} token has expired")
-            
-            # Extract name and decode Unicode escapes
-            name = None
-            if token_name == "portal3_login":
-                name = decoded.get('usr', {}).get('name', '')
-            else:
-                name = decoded.get('name', '')
-                
-            # Handle Unicode escapes
-            name = self._decode_unicode_escape(name)
-            
-            return TokenInfo(
-                raw_token=token,
-                decoded_data=decoded,
-                expiration=expiration,
-                name=name
-            )
-            
-        except (jwt.InvalidTokenError, json.JSONDecodeError, base64.binascii.Error) as e:
-            raise LoginError(f"Invalid {token_name} token: {str(e)}")
-
+        self._session.close()
+        self._decode_raw.cache_clear()
+    
+    def __enter__(self) -> "BmstuLksClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+    
     def login(self, username: str, password: str) -> LoginResponse:
         """Log in to BMSTU LKS portal.
         
@@ -171,102 +462,71 @@ class BmstuLksClient:
         Raises:
             LoginError: If login process fails.
         """
-        with requests.Session() as session:
-            # Start at portal login page
-            encoded_back_url = quote(self.PORTAL_PROFILE_URL)
-            portal_login_with_back = f"{self.PORTAL_LOGIN_URL}?back={encoded_back_url}"
-            
-            self.logger.info("Starting login process...")
-            portal_response = session.get(portal_login_with_back, headers=self.headers, allow_redirects=True)
-            
-            if portal_response.status_code != 200:
-                raise LoginError(f"Failed to access portal login page: {portal_response.status_code}")
-            
-            # Get the CAS login form
-            cas_url = portal_response.url
-            form_data = self._extract_form_data(portal_response.text)
+        session = self._session
+        # Start each login with a clean cookie jar so a previous user's
+        # CAS session is never reused.
+        session.cookies.clear()
+        
+        # Start at portal login page
+        self.logger.info("Starting login process...")
+        portal_response = session.get(self._PORTAL_LOGIN_WITH_BACK, allow_redirects=True)
+        
+        if portal_response.status_code != 200:
+            raise LoginError(f"Failed to access portal login page: {portal_response.status_code}")
+        
+        # Get the CAS login form
+        cas_url = portal_response.url
+        form_data, cas_headers = _prepare_cas_login(portal_response.content, cas_url, username, password)
+        
+        # Submit CAS login
+        self.logger.info("Submitting login credentials...")
+        cas_response = session.post(
+            cas_url,
+            data=form_data,
+            headers=cas_headers,
+            allow_redirects=False
+        )
+        
+        if cas_response.status_code == 401:
+            raise LoginError("Invalid username or password")
+        
+        # Follow redirects manually to capture all cookies
+        current_response = cas_response
+        login_token = None
+        info_token = None
+        
+        hops = 0
+        
+        while current_response.status_code in _REDIRECT_STATUSES:
+            location = current_response.headers.get('Location')
+            if not location:
+                break
             
-            form_data.update({
-                "username": username,
-                "password": password,
-                "submit": "LOGIN"
-            })
+            hops += 1
+            if hops > session.max_redirects:
+                raise LoginError(f"Exceeded {session.max_redirects} redirects")
             
-            # Prepare headers for CAS login
-            cas_headers = self.headers.copy()
-            cas_headers.update({
-                'Origin': 'https://proxy.bmstu.ru:8443',
-                'Referer': cas_url,
-                'Content-Type': 'application/x-www-form-urlencoded'
-            })
+            redirect_url, redirect_headers = _next_hop(current_response.url, location, self.PORTAL_LOGIN_URL)
             
-            # Submit CAS login
-            self.logger.info("Submitting login credentials...")
-            cas_response = session.post(
-                cas_url,
-                data=form_data,
-                headers=cas_headers,
-                allow_redirects=False
+            current_response = session.get(
+                redirect_url,
+                headers=redirect_headers,
+                allow_redirects=False,
+                stream=True
             )
+            # Only headers are used on redirect hops: discard the body without
+            # decoding it and hand the connection back to the pool
+            _discard_body(current_response)
             
-            if cas_response.status_code == 401:
-                raise LoginError("Invalid username or password")
-            
-            # Follow redirects manually to capture all cookies
-            current_response = cas_response
-            login_token = None
-            info_token = None
-            
-            while current_response.status_code in (301, 302, 303, 307):
-                redirect_url = current_response.headers.get('Location')
-                if not redirect_url:
-                    break
-                    
-                # Make redirect URL absolute if it's relative
-                if redirect_url.startswith('/'):
-                    redirect_url = urljoin(current_response.url, redirect_url)
-                    
-                # Update headers based on domain
-                redirect_headers = self.headers.copy()
-                if 'lks.bmstu.ru' in redirect_url:
-                    redirect_headers['Origin'] = 'https://lks.bmstu.ru'
-                    redirect_headers['Referer'] = self.PORTAL_LOGIN_URL
-                else:
-                    redirect_headers['Origin'] = 'https://proxy.bmstu.ru:8443'
-                    redirect_headers['Referer'] = current_response.url
-                
-                current_response = session.get(
-                    redirect_url,
-                    headers=redirect_headers,
-                    allow_redirects=False
-                )
-                
-                # Check for portal tokens in Set-Cookie header
-                if 'Set-Cookie' in current_response.headers:
-                    cookies = current_response.headers.get_all('Set-Cookie') if hasattr(current_response.headers, 'get_all') else [current_response.headers.get('Set-Cookie')]
-                    for cookie in cookies:
-                        if not login_token:
-                            login_token = self._extract_token_from_cookie(cookie, 'portal3_login')
-                        if not info_token:
-                            info_token = self._extract_token_from_cookie(cookie, 'portal3_info')
-                        
-                        if login_token and info_token:
-                            self.logger.info("Successfully obtained portal tokens")
-                            
-                            # Decode both tokens
-                            login_token_info = self._decode_portal_token(login_token, "portal3_login")
-                            info_token_info = self._decode_portal_token(info_token, "portal3_info")
-                            
-                            # Extract additional user info
-                            user_info = login_token_info.decoded_data.get('usr', {})
-                            student_id = user_info.get('id')
-                            group = self._decode_unicode_escape(user_info.get('alias', ''))
-                            
-                            return LoginResponse(
-                                login_token=login_token_info,
-                                info_token=info_token_info,
-                                student_id=student_id,
-                                group=group
-                            )
+            # Portal tokens are parsed into the session cookie jar as responses arrive
+            login_token, info_token = _portal_tokens(session.cookies)
             
+            if login_token and info_token:
+                break
+        
+        if not (login_token and info_token):
             raise LoginError("Did not receive portal tokens")
+        
+        self.logger.info("Successfully obtained portal tokens")
+        
+        return _build_login_response(login_token, info_token, self.current_time, self._decode_raw)
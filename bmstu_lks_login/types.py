@@ -5,16 +5,16 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TokenInfo:
     """Information extracted from a portal token."""
     raw_token: str  # The original token string
-    decoded_data: dict  # The decoded token data
+    decoded_data: dict  # The decoded token data (read-only)
     expiration: datetime  # Token expiration time
     name: Optional[str] = None  # User's name if available
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoginResponse:
     """Response from a successful login attempt."""
     login_token: TokenInfo  # The portal3_login token info
@@ -0,0 +1,128 @@
+"""Shared fixtures: a local fake of the portal and CAS login flow."""
+
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+EXPIRE = int(datetime(2100, 1, 1).timestamp())
+
+
+def login_token(user: str) -> str:
+    payload = {'exp': EXPIRE, 'usr': {'name': user, 'id': user, 'alias': 'IU7-11B'}}
+    encoded = base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b'=').decode()
+    return f'header.{encoded}.signature'
+
+
+def info_token(user: str) -> str:
+    return base64.b64encode(json.dumps({'expire': EXPIRE, 'name': user}).encode()).decode()
+
+
+class FakePortal:
+    """Serves the portal and CAS endpoints the login flow goes through.
+    
+    Special usernames change the flow: "notokens" never gets token cookies,
+    "twopaths" gets __portal3_login on two paths and "loop" is redirected
+    forever. GET /loop redirects to itself.
+    """
+    
+    password = 'secret'
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.next_session = 0
+        self.connections = set()
+        self.requests = []
+        
+        portal = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                portal.handle(self, 'GET')
+            
+            def do_POST(self):
+                portal.handle(self, 'POST')
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f'http://127.0.0.1:{self.server.server_port}'
+        self.login_url = f'{self.base}/portal3/login?back=%2Fprofile'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+    
+    def handle(self, handler, method):
+        url = urlsplit(handler.path)
+        query = parse_qs(url.query)
+        body = handler.rfile.read(int(handler.headers.get('Content-Length', 0)))
+        cookie = handler.headers.get('Cookie', '')
+        with self.lock:
+            self.connections.add(handler.client_address)
+            self.requests.append((method, url.path, cookie))
+        
+        if url.path == '/portal3/login':
+            self.respond(handler, 302, [('Location', f'{self.base}/cas/login?service=portal'),
+                                        ('Set-Cookie', 'portal_session=1; Path=/')])
+        elif url.path == '/loop':
+            self.respond(handler, 302, [('Location', '/loop')])
+        elif url.path == '/cas/login' and method == 'GET':
+            with self.lock:
+                session = self.next_session
+                self.next_session += 1
+            # Give concurrent logins a chance to interleave
+            time.sleep(0.05)
+            page = ('<html><body><form method="post">'
+                    '<input type="text" name="username"><input type="password" name="password">'
+                    f'<input type="hidden" name="execution" value="e{session}">'
+                    '<input type="hidden" name="_eventId" value="submit">'
+                    '</form></body></html>')
+            self.respond(handler, 200, [('Set-Cookie', f'JSESSIONID=s{session}; Path=/cas')], page.encode())
+        elif url.path == '/cas/login' and method == 'POST':
+            form = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+            # The CAS session cookie must belong to the form that is submitted
+            if f"JSESSIONID=s{form.get('execution', '')[1:]}" not in cookie:
+                self.respond(handler, 403)
+            elif form.get('password') != self.password:
+                self.respond(handler, 401)
+            elif form['username'] == 'loop':
+                self.respond(handler, 302, [('Location', '/loop')])
+            else:
+                self.respond(handler, 302, [('Location', f"{self.base}/portal3/callback?u={form['username']}")])
+        elif url.path == '/portal3/callback':
+            user = query['u'][0]
+            headers = [('Location', '/profile')]
+            if user == 'twopaths':
+                headers.append(('Set-Cookie', f'__portal3_login={login_token(user)}; Path=/portal3'))
+            if user != 'notokens':
+                headers.append(('Set-Cookie', f'__portal3_login={login_token(user)}; Path=/'))
+                headers.append(('Set-Cookie', f'__portal3_info={info_token(user)}; Path=/'))
+            self.respond(handler, 302, headers, b'<html>redirecting</html>' * 100)
+        elif url.path == '/profile':
+            self.respond(handler, 200, body=b'<html>profile</html>')
+        else:
+            self.respond(handler, 404)
+    
+    @staticmethod
+    def respond(handler, status, headers=(), body=b''):
+        handler.send_response(status)
+        for name, value in headers:
+            handler.send_header(name, value)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+
+@pytest.fixture
+def portal():
+    portal = FakePortal()
+    portal.thread.start()
+    yield portal
+    portal.server.shutdown()
+    portal.server.server_close()
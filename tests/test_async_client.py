@@ -0,0 +1,52 @@
+"""Tests for the asynchronous login client."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('httpx')
+
+from bmstu_lks_login import AsyncBmstuLksClient, LoginError
+
+
+def run_logins(portal, *usernames, login_url=None):
+    """Log the given users in concurrently on one client."""
+    async def main():
+        async with AsyncBmstuLksClient() as client:
+            client._PORTAL_LOGIN_WITH_BACK = login_url or portal.login_url
+            results = await asyncio.gather(
+                *(client.login(username, portal.password) for username in usernames),
+                return_exceptions=True
+            )
+            return results, len(client._client.cookies.jar)
+    return asyncio.run(main())
+
+
+def test_concurrent_logins_keep_cookies_apart(portal):
+    results, shared_cookies = run_logins(portal, 'alice', 'bob', 'carol')
+    assert [response.student_id for response in results] == ['alice', 'bob', 'carol']
+    assert [response.info_token.name for response in results] == ['alice', 'bob', 'carol']
+    assert shared_cookies == 0
+    # The fake CAS rejects a form posted with another login's session, so the
+    # successful logins above already prove isolation; also check nothing piled up
+    for method, path, cookie in portal.requests:
+        assert cookie.count('JSESSIONID') <= 1
+        assert cookie.count('portal_session') <= 1
+
+
+def test_missing_tokens(portal):
+    [error], _ = run_logins(portal, 'notokens')
+    assert isinstance(error, LoginError)
+    assert 'Did not receive portal tokens' in str(error)
+
+
+def test_login_redirect_loop_is_capped(portal):
+    [error], _ = run_logins(portal, 'loop')
+    assert isinstance(error, LoginError)
+    assert 'redirects' in str(error)
+
+
+def test_followed_redirects_are_capped(portal):
+    [error], _ = run_logins(portal, 'alice', login_url=f'{portal.base}/loop')
+    assert isinstance(error, LoginError)
+    assert 'redirects' in str(error)
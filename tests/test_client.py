@@ -0,0 +1,81 @@
+"""Tests for the synchronous login client."""
+
+import pytest
+import requests
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from bmstu_lks_login import BmstuLksClient, LoginError
+from bmstu_lks_login.client import _discard_body
+
+
+class BrokenRaw:
+    def __init__(self, error):
+        self.error = error
+        self.closed = False
+    
+    def read(self, decode_content=True):
+        raise self.error
+    
+    def close(self):
+        self.closed = True
+
+
+@pytest.mark.parametrize('error, expected', [
+    (ProtocolError('Connection broken'), requests.exceptions.ChunkedEncodingError),
+    (ReadTimeoutError(None, None, 'Read timed out'), requests.exceptions.ConnectionError),
+])
+def test_discard_body_wraps_urllib3_errors(error, expected):
+    response = requests.Response()
+    response.raw = BrokenRaw(error)
+    with pytest.raises(expected):
+        _discard_body(response)
+    assert response.raw.closed
+
+
+@pytest.fixture
+def client(portal):
+    client = BmstuLksClient()
+    client._PORTAL_LOGIN_WITH_BACK = portal.login_url
+    yield client
+    client.close()
+
+
+def test_login(client, portal):
+    response = client.login('alice', portal.password)
+    assert response.student_id == 'alice'
+    assert response.group == 'IU7-11B'
+    assert response.login_token.name == 'alice'
+    assert response.info_token.name == 'alice'
+
+
+def test_logins_reuse_connection_and_not_cookies(client, portal):
+    for user in ('alice', 'bob', 'carol'):
+        assert client.login(user, portal.password).student_id == user
+    assert len(portal.connections) == 1
+    # Each login starts without the previous user's cookies
+    starts = [cookie for method, path, cookie in portal.requests if path == '/portal3/login']
+    assert starts == ['', '', '']
+
+
+def test_stops_following_redirects_once_tokens_are_set(client, portal):
+    client.login('alice', portal.password)
+    assert '/profile' not in [path for method, path, cookie in portal.requests]
+
+
+def test_token_cookie_on_two_paths(client, portal):
+    assert client.login('twopaths', portal.password).student_id == 'twopaths'
+
+
+def test_missing_tokens(client, portal):
+    with pytest.raises(LoginError, match='Did not receive portal tokens'):
+        client.login('notokens', portal.password)
+
+
+def test_wrong_password(client, portal):
+    with pytest.raises(LoginError, match='Invalid username or password'):
+        client.login('alice', 'wrong')
+
+
+def test_redirect_loop_is_capped(client, portal):
+    with pytest.raises(LoginError, match='redirects'):
+        client.login('loop', portal.password)
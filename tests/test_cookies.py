@@ -0,0 +1,27 @@
+"""Tests for portal token cookie lookup."""
+
+import pytest
+from requests.cookies import RequestsCookieJar
+
+from bmstu_lks_login.client import _find_cookie
+
+
+def test_same_cookie_on_several_paths():
+    jar = RequestsCookieJar()
+    jar.set('__portal3_login', 'first', domain='lks.bmstu.ru', path='/')
+    jar.set('__portal3_login', 'second', domain='lks.bmstu.ru', path='/portal3')
+    assert _find_cookie(jar, '__portal3_login') == 'first'
+
+
+def test_same_cookie_on_several_domains_in_httpx_jar():
+    httpx = pytest.importorskip('httpx')
+    cookies = httpx.Cookies()
+    cookies.set('__portal3_info', 'first', domain='lks.bmstu.ru')
+    cookies.set('__portal3_info', 'second', domain='proxy.bmstu.ru')
+    assert _find_cookie(cookies.jar, '__portal3_info') == 'first'
+
+
+def test_missing_cookie():
+    jar = RequestsCookieJar()
+    jar.set('JSESSIONID', 'x', domain='proxy.bmstu.ru', path='/')
+    assert _find_cookie(jar, '__portal3_login') is None
@@ -0,0 +1,106 @@
+"""Tests for login form extraction."""
+
+import pytest
+
+from bmstu_lks_login.client import (
+    LoginError,
+    _extract_form_data,
+    _parse_hidden_inputs,
+    _scan_hidden_inputs,
+)
+
+
+def page(body: str, head: str = '') -> bytes:
+    return f'<html><head>{head}</head><body>{body}</body></html>'.encode('utf-8')
+
+
+CAS_PAGE = page(
+    '<form id="fm1" method="post" action="/cas/login">'
+    '<input id="username" name="username" type="text" value="">'
+    '<input type="password" name="password">'
+    '<input type="hidden" name="execution" value="e1s1"/>'
+    "<input type='hidden' name='_eventId' value='submit'>"
+    '<input type="submit" name="submit" value="LOGIN">'
+    '</form>'
+)
+
+
+def test_extracts_hidden_inputs_only():
+    assert _extract_form_data(CAS_PAGE) == {'execution': 'e1s1', '_eventId': 'submit'}
+
+
+@pytest.mark.parametrize('html_content, expected', [
+    # A quote of the other kind inside the value
+    (page('<form><input type="hidden" name="a" value="abc\'def"></form>'), {'a': "abc'def"}),
+    (page('<form><input type="hidden" name="a" value=\'say "hi"\'></form>'), {'a': 'say "hi"'}),
+    # '>' inside a quoted value does not end the tag
+    (page('<form><input type="hidden" name="a" value="x>y"></form>'), {'a': 'x>y'}),
+    # Unquoted attributes, mixed with quoted ones
+    (page('<form><input type=hidden name=a value=1><input type="hidden" name="b" value="2"></form>'),
+     {'a': '1', 'b': '2'}),
+    # Attribute names and the type value are case-insensitive
+    (page('<form><INPUT TYPE="HIDDEN" NAME="a" VALUE="1"></form>'), {'a': '1'}),
+    # Entities are decoded
+    (page('<form><input type="hidden" name="a" value="x&amp;y&quot;"></form>'), {'a': 'x&y"'}),
+    # Missing value means an empty one
+    (page('<form><input type="hidden" name="a"></form>'), {'a': ''}),
+    # Attributes that merely end in "name" or "type" are ignored
+    (page('<form><input data-type="text" type="hidden" data-name="x" name="a" value="1"></form>'),
+     {'a': '1'}),
+])
+def test_scan_matches_lxml(html_content, expected):
+    assert _scan_hidden_inputs(html_content) == expected
+    assert _parse_hidden_inputs(html_content) == expected
+    assert _extract_form_data(html_content) == expected
+
+
+def test_only_first_form_is_used():
+    html_content = page(
+        '<form><input type="hidden" name="a" value="1"></form>'
+        '<form><input type="hidden" name="b" value="2"></form>'
+    )
+    assert _scan_hidden_inputs(html_content) == {'a': '1'}
+    assert _parse_hidden_inputs(html_content) == {'a': '1'}
+
+
+def test_commented_out_inputs_are_ignored():
+    html_content = page(
+        '<!-- <form><input type="hidden" name="old" value="0"></form> -->'
+        '<form><!-- <input type="hidden" name="b" value="2"> -->'
+        '<input type="hidden" name="a" value="1"></form>'
+    )
+    assert _scan_hidden_inputs(html_content) == {'a': '1'}
+    assert _parse_hidden_inputs(html_content) == {'a': '1'}
+
+
+def test_malformed_tag_falls_back_to_lxml():
+    html_content = page(
+        '<form><input type="hidden" name="a" value="1">'
+        '<input type="hidden" name="b" value="2></form>'
+    )
+    assert _scan_hidden_inputs(html_content) is None
+    assert _extract_form_data(html_content) == _parse_hidden_inputs(html_content)
+
+
+def test_non_utf8_page_falls_back_to_lxml():
+    html_content = (
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=windows-1251">'
+        '</head><body><form><input type="hidden" name="a" value="Привет"></form></body></html>'
+    ).encode('cp1251')
+    assert _scan_hidden_inputs(html_content) is None
+    assert _extract_form_data(html_content) == {'a': 'Привет'}
+
+
+def test_missing_form_raises_login_error():
+    with pytest.raises(LoginError):
+        _extract_form_data(page('<input type="hidden" name="a" value="1">'))
+
+
+def test_form_without_hidden_inputs_raises_login_error():
+    with pytest.raises(LoginError):
+        _extract_form_data(page('<form><input type="text" name="a"></form>'))
+
+
+def test_empty_page_raises_login_error():
+    with pytest.raises(LoginError):
+        _extract_form_data(b'')
@@ -0,0 +1,85 @@
+"""Tests for portal token decoding."""
+
+import base64
+import copy
+import json
+from datetime import datetime
+
+import pytest
+
+from bmstu_lks_login import BmstuLksClient, LoginError
+from bmstu_lks_login.client import _decode_portal_token
+
+NOW = datetime(2024, 1, 1)
+EXPIRE = int(datetime(2024, 1, 2).timestamp())
+
+
+def login_token(payload: dict) -> str:
+    encoded = base64.urlsafe_b64encode(json.dumps(payload).encode()).rstrip(b'=').decode()
+    return f'header.{encoded}.signature'
+
+
+def info_token(payload: dict) -> str:
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_decodes_login_token():
+    token = login_token({'exp': EXPIRE, 'usr': {'name': 'Ivan', 'id': '42'}})
+    info = _decode_portal_token(token, 'portal3_login', NOW)
+    assert info.name == 'Ivan'
+    assert info.decoded_data['usr']['id'] == '42'
+    assert info.expiration == datetime.fromtimestamp(EXPIRE)
+
+
+def test_decodes_info_token():
+    info = _decode_portal_token(info_token({'expire': EXPIRE, 'name': 'Ivan'}), 'portal3_info', NOW)
+    assert info.name == 'Ivan'
+
+
+def test_expired_token_raises_login_error():
+    token = login_token({'exp': EXPIRE, 'usr': {}})
+    with pytest.raises(LoginError, match='expired'):
+        _decode_portal_token(token, 'portal3_login', datetime(2024, 1, 3))
+
+
+@pytest.mark.parametrize('token, token_name', [
+    ('not-a-jwt', 'portal3_login'),
+    (login_token([1, 2]), 'portal3_login'),
+    (login_token({'usr': {}}), 'portal3_login'),
+    ('!!!', 'portal3_info'),
+])
+def test_invalid_token_raises_login_error(token, token_name):
+    with pytest.raises(LoginError):
+        _decode_portal_token(token, token_name, NOW)
+
+
+def test_decoded_data_is_read_only():
+    token = login_token({'exp': EXPIRE, 'usr': {'name': 'Ivan', 'roles': ['student']}})
+    data = _decode_portal_token(token, 'portal3_login', NOW).decoded_data
+    with pytest.raises(TypeError):
+        data['exp'] = 0
+    with pytest.raises(TypeError):
+        data['usr'].update(name='Changed')
+    assert data['usr']['roles'] == ('student',)
+
+
+def test_decoded_data_copies_are_plain_dicts():
+    token = login_token({'exp': EXPIRE, 'usr': {'name': 'Ivan'}})
+    data = _decode_portal_token(token, 'portal3_login', NOW).decoded_data
+    copied = copy.deepcopy(data)
+    copied['usr']['name'] = 'Changed'
+    assert data['usr']['name'] == 'Ivan'
+    assert json.loads(json.dumps(data)) == {'exp': EXPIRE, 'usr': {'name': 'Ivan'}}
+
+
+def test_token_cache_is_per_client():
+    token = login_token({'exp': EXPIRE, 'usr': {}})
+    first, second = BmstuLksClient(), BmstuLksClient()
+    first_info = _decode_portal_token(token, 'portal3_login', NOW, first._decode_raw)
+    _decode_portal_token(token, 'portal3_login', NOW, second._decode_raw)
+    assert _decode_portal_token(token, 'portal3_login', NOW, first._decode_raw).decoded_data is first_info.decoded_data
+    
+    first.close()
+    assert first._decode_raw.cache_info().currsize == 0
+    assert second._decode_raw.cache_info().currsize == 1
+    second.close()